@@ -8,13 +8,28 @@ Preserves:
 - bottom comments (after final closing brace)
 Uses full key paths to avoid collisions.
 """
+import functools
+import json
 import re
 import sys
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import commentjson
+import orjson
 
-KEY_RE = re.compile(r'^\s*"([^"]+)":')
+KEY_RE = re.compile(r'^(\s*)"([^"]+)":')
+INDENT_RE = re.compile(r"\s*")
+# String literals (an unterminated one runs to end of line) or a comment start
+SPLIT_RE = re.compile(r'"(?:\\.|[^"\\])*"?|//')
+# String literals or a // comment running to end of line
+COMMENT_RE = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*')
+# Starting a process pool (forking workers, pickling paths and results)
+# takes a few milliseconds, roughly the time to format a handful of small
+# config files sequentially, so smaller batches are not worth fanning out.
+# The pre-commit hooks set require_serial so this is the only fan-out.
+POOL_MIN_FILES = 5
 
 
 def split_content_and_comment(line: str) -> tuple[str, str | None]:
@@ -26,40 +41,80 @@ def split_content_and_comment(line: str) -> tuple[str, str | None]:
     :return: A tuple containing the content part and the inline comment (if any)
     :rtype: tuple[str, str | None]
     """
-    in_string = False
-    escaped = False
-    for i, ch in enumerate(line):
-        if ch == '"' and not escaped:
-            in_string = not in_string
-        elif ch == "\\" and not escaped:
-            escaped = True
-            continue
-        elif (
-            not in_string
-            and ch == "/"
-            and i + 1 < len(line)
-            and line[i + 1] == "/"
-        ):
+    for m in SPLIT_RE.finditer(line):
+        if m.group() == "//":
             # Found real comment start outside string
-            return line[:i].rstrip(), line[i:].strip()
-        escaped = False
+            return line[: m.start()].rstrip(), line[m.start() :].strip()
     return line.rstrip(), None
 
 
+def strip_comment(m: re.Match) -> str:
+    """
+    Substitution callback for COMMENT_RE: keep strings, drop comments.
+
+    :param m: A COMMENT_RE match
+    :type m: re.Match
+    :return: The replacement text
+    :rtype: str
+    """
+    return m.group() if m.group().startswith('"') else ""
+
+
+def reject_constant(name: str):
+    """
+    parse_constant callback for json.loads: reject NaN and +/-Infinity.
+
+    These are not valid JSON and commentjson rejects them, so raising here
+    hands such content to the commentjson fallback to fail as malformed.
+
+    :param name: The constant name ("NaN", "Infinity" or "-Infinity")
+    :type name: str
+    :raises ValueError: Always
+    """
+    raise ValueError(f"Invalid JSON constant: {name}")
+
+
+@functools.lru_cache(maxsize=256)
+def parse_jsonc(content: str):
+    """
+    Parse JSONC content, using the C json parser where possible.
+
+    // comments are stripped up front so the stdlib parser can be used;
+    anything it rejects is handed to commentjson, which either accepts it
+    or raises for malformed content. Results are cached per content for
+    repeated calls from a long-running process, so callers must not mutate
+    the returned data.
+
+    :param content: The JSONC text to parse
+    :type content: str
+    :return: The parsed data
+    """
+    try:
+        return json.loads(
+            COMMENT_RE.sub(strip_comment, content),
+            parse_constant=reject_constant,
+        )
+    except ValueError:
+        return commentjson.loads(content)
+
+
 def extract_comments(
     lines: list[str],
-) -> tuple[list[str], list[str], dict[str, list[str]], dict[str, str]]:
+) -> tuple[
+    list[str], dict[str, tuple[list[str], str | None]], list[str], bool
+]:
     """
     Extract comments from JSONC lines.
 
     :param lines: The lines of the JSONC file
     :type lines: list[str]
-    :return: A tuple containing top comments, bottom comments, leading comments, and inline comments
-    :rtype: tuple[list[str], list[str], dict[str, list[str]], dict[str, str]]
+    :return: A tuple containing top comments, (leading, inline) comments per key path, bottom comments, and whether any non-comment content exists
+    :rtype: tuple[list[str], dict[str, tuple[list[str], str | None]], list[str], bool]
     """
-    top, bottom, leading, inline = [], [], {}, {}
+    top, bottom, key_comments = [], [], {}
     cur_comments, path_stack = [], []
     in_obj = False
+    has_content = False
 
     def full_path(key=None):
         return ".".join(path_stack + ([key] if key else []))
@@ -74,12 +129,18 @@ def extract_comments(
             else:
                 cur_comments.append(line.strip())
             continue
+        has_content = True
 
-        if content.startswith("{"):
+        # The first non-blank character tells braces and keys apart
+        first = content[INDENT_RE.match(content).end()]
+        if first == "{":
+            # Nested (e.g. array element) braces keep their comment
+            if in_obj and comment:
+                cur_comments.append(comment)
             in_obj = True
             continue
 
-        if content.startswith("}"):
+        if first == "}":
             # Keep trailing comment for next key
             if comment:
                 cur_comments.append(comment)
@@ -87,23 +148,216 @@ def extract_comments(
                 path_stack.pop()
             continue
 
-        m = KEY_RE.match(content)
+        m = KEY_RE.match(content) if first == '"' else None
         if m:
-            key = m.group(1)
+            key = m.group(2)
             fp = full_path(key)
-            if cur_comments:
-                leading[fp] = cur_comments.copy()
+            if cur_comments or comment:
+                # Repeated paths (e.g. array elements) keep unset halves
+                prev_leading, prev_inline = key_comments.get(fp, ([], None))
+                key_comments[fp] = (
+                    cur_comments or prev_leading,
+                    comment or prev_inline,
+                )
                 cur_comments = []
-            if comment:
-                inline[fp] = comment
-            if "{" in content:
+            if content.endswith("{"):
                 path_stack.append(key)
         elif comment:
             cur_comments.append(comment)
 
     # Any remaining comments after last line
     bottom.extend(cur_comments)
-    return top, leading, inline, bottom
+    return top, key_comments, bottom, has_content
+
+
+def write_if_changed(path: Path, text: str, original: str) -> None:
+    """
+    Write text to a file, skipping the write if it matches the original.
+
+    :param path: The path to the file to write
+    :type path: Path
+    :param text: The new file contents
+    :type text: str
+    :param original: The file contents as last read
+    :type original: str
+    """
+    if text != original:
+        path.write_bytes(text.encode("utf-8"))
+
+
+def dump_json(value) -> str:
+    """
+    Serialize JSON data with 2-space indentation.
+
+    orjson is used where possible; values it cannot encode (integers
+    outside the 64-bit range, lone surrogates) go through the stdlib
+    encoder instead. Like orjson, that keeps non-ASCII characters as-is,
+    and only escapes them when the text would not encode as UTF-8.
+
+    :param value: The JSON value to serialize
+    :return: The serialized JSON text
+    :rtype: str
+    """
+    try:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+    except TypeError:  # Includes orjson.JSONEncodeError
+        pass
+    text = json.dumps(value, indent=2, ensure_ascii=False)
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:  # Lone surrogates
+        text = json.dumps(value, indent=2)
+    return text
+
+
+def needs_rescan(value, in_array: bool = False) -> bool:
+    """
+    Check whether parsed JSON has members without an unambiguous key path.
+
+    That is the case for objects nested inside arrays and for keys that
+    KEY_RE cannot match verbatim (empty, or needing escapes).
+
+    :param value: The parsed JSON value to check
+    :param in_array: Whether the value is itself an array element
+    :type in_array: bool
+    :return: True if comments cannot be attached by walking the data
+    :rtype: bool
+    """
+    if isinstance(value, dict):
+        return in_array or any(
+            not k
+            or json.dumps(k, ensure_ascii=False)[1:-1] != k
+            or needs_rescan(v)
+            for k, v in value.items()
+        )
+    if isinstance(value, list):
+        return any(needs_rescan(v, True) for v in value)
+    return False
+
+
+def emit_object(
+    obj: dict,
+    key_comments: dict[str, tuple[list[str], str | None]],
+    indent: str,
+    prefix: str,
+) -> Iterator[str]:
+    """
+    Yield the members of a JSON object with their comments attached.
+
+    Nested non-empty objects are walked recursively; any other value is
+    rendered by dump_json and re-indented in place.
+
+    :param obj: The object whose members to emit
+    :type obj: dict
+    :param key_comments: The (leading, inline) comments per key path
+    :type key_comments: dict[str, tuple[list[str], str | None]]
+    :param indent: The indentation of the members
+    :type indent: str
+    :param prefix: The key path prefix of the members (empty or ending in ".")
+    :type prefix: str
+    :return: An iterator over the output lines
+    :rtype: Iterator[str]
+    """
+    last = len(obj) - 1
+    for i, (key, value) in enumerate(obj.items()):
+        fp = prefix + key
+        leading, inline = key_comments.get(fp, ((), None))
+        yield from (indent + c for c in leading if c)
+
+        comma = "," if i < last else ""
+        inline = " " + inline if inline else ""
+        head = indent + dump_json(key) + ": "
+        if isinstance(value, dict) and value:
+            yield head + "{" + inline
+            yield from emit_object(
+                value, key_comments, indent + "  ", fp + "."
+            )
+            yield indent + "}" + comma
+            continue
+
+        first, *rest = dump_json(value).splitlines()
+        if not rest:
+            yield head + first + comma + inline
+            continue
+        yield head + first + inline
+        yield from (indent + ln for ln in rest[:-1])
+        yield indent + rest[-1] + comma
+
+
+def emit_formatted(
+    formatted: list[str],
+    key_comments: dict[str, tuple[list[str], str | None]],
+) -> Iterator[str]:
+    """
+    Yield serializer output lines with comments reinserted by key matching.
+
+    :param formatted: The lines of the comment-free formatted JSON
+    :type formatted: list[str]
+    :param key_comments: The (leading, inline) comments per key path
+    :type key_comments: dict[str, tuple[list[str], str | None]]
+    :return: An iterator over the output lines
+    :rtype: Iterator[str]
+    """
+    yield formatted[0]
+    prefix, prefix_stack = "", []
+
+    for line in formatted[1:-1]:
+        stripped = line.strip()
+        if stripped.startswith("}"):
+            if prefix_stack:
+                prefix = prefix_stack.pop()
+            yield line
+            continue
+
+        m = KEY_RE.match(line)
+        if m:
+            indent, key = m.groups()
+            fp = prefix + key
+            leading, inline = key_comments.get(fp, ((), None))
+            yield from (indent + c for c in leading if c)
+            yield line + " " + inline if inline else line
+            if line.endswith("{"):
+                prefix_stack.append(prefix)
+                prefix = fp + "."
+        else:
+            yield line
+
+    if len(formatted) > 1:  # Non-empty object
+        yield formatted[-1]
+
+
+def emit_lines(
+    data,
+    top: list[str],
+    key_comments: dict[str, tuple[list[str], str | None]],
+    bottom: list[str],
+) -> Iterator[str]:
+    """
+    Yield formatted JSONC lines with the extracted comments reinserted.
+
+    Top-level objects are walked directly, attaching comments by key path.
+    Data where that path is ambiguous (see needs_rescan) or that is not an
+    object is serialized first and the output re-scanned instead.
+    Empty lines are dropped.
+
+    :param data: The parsed JSON data
+    :param top: The top comments
+    :type top: list[str]
+    :param key_comments: The (leading, inline) comments per key path
+    :type key_comments: dict[str, tuple[list[str], str | None]]
+    :param bottom: The bottom comments
+    :type bottom: list[str]
+    :return: An iterator over the output lines
+    :rtype: Iterator[str]
+    """
+    yield from (ln for ln in top if ln.strip())
+    if isinstance(data, dict) and not needs_rescan(data):
+        yield "{"
+        yield from emit_object(data, key_comments, "  ", "")
+        yield "}"
+    else:
+        yield from emit_formatted(dump_json(data).splitlines(), key_comments)
+    yield from (ln for ln in bottom if ln.strip())
 
 
 def format_jsonc_file(path: Path) -> None:
@@ -113,81 +367,56 @@ def format_jsonc_file(path: Path) -> None:
     :param path: The path to the JSONC file to format
     :type path: Path
     """
-    lines = [ln + "\n" for ln in path.read_text().splitlines()]
-    top, leading, inline, bottom = extract_comments(lines)
+    content = path.read_bytes().decode("utf-8")
+    lines = content.splitlines()
+    top, key_comments, bottom, has_content = extract_comments(lines)
 
     # Preserve pure comment files
-    non_empty_lines = [ln for ln in lines if ln.strip()]
-    non_comment_lines = [
-        ln for ln in non_empty_lines if not ln.strip().startswith("//")
-    ]
-    if not non_comment_lines:
+    if not has_content:
         out_lines = [ln.lstrip().rstrip() for ln in lines if ln.strip()]
-        path.write_text("\n".join(out_lines) + "\n")
+        write_if_changed(path, "\n".join(out_lines) + "\n", content)
         return
 
     # Try parsing JSONC content to check validity
-    content = path.read_text()
     try:
-        data = commentjson.loads(content)
+        data = parse_jsonc(content)
         if not data:
             # Empty JSON content: keep comments
             out_lines = [ln.lstrip().rstrip() for ln in lines if ln.strip()]
-            path.write_text("\n".join(out_lines) + "\n")
+            write_if_changed(path, "\n".join(out_lines) + "\n", content)
             return
     except commentjson.JSONLibraryException:
         # Malformed JSON: fail
         raise
 
-    # Load and format content
-    formatted = commentjson.dumps(data, indent=2).splitlines()
+    # Format content with comments preserved
+    out_lines = emit_lines(data, top, key_comments, bottom)
+    write_if_changed(path, "\n".join(out_lines) + "\n", content)
 
-    # Re-dump content with comments preserved
-    opening, closing = formatted[0], formatted[-1]
-    out_lines = top + [opening]
-    stack = []
 
-    for line in formatted[1:-1]:
-        stripped = line.strip()
-        if stripped.startswith("}"):
-            if stack:
-                stack.pop()
-            out_lines.append(line)
-            continue
-
-        m = KEY_RE.match(line)
-        if m:
-            key = m.group(1)
-            fp = ".".join(stack + [key])
-            indent = line[: line.index('"')]
-            if fp in leading:
-                for c in leading[fp]:
-                    out_lines.append(indent + c.strip())
-            out_lines.append(line)
-            if fp in inline:
-                out_lines[-1] += " " + inline[fp]
-            if line.strip().endswith("{"):
-                stack.append(key)
-        else:
-            out_lines.append(line)
+def try_format_jsonc_file(p: str) -> tuple[str, bool]:
+    """
+    Format a JSONC file, reporting failure instead of raising.
 
-    if len(formatted) > 1:  # Non-empty object
-        out_lines.append(closing)
-    out_lines.extend(bottom)
-    out_lines = [
-        ln for ln in out_lines if ln.strip()
-    ]  # Remove all empty lines (except one at end)
-    path.write_text("\n".join(out_lines) + "\n")
+    :param p: The path to the JSONC file to format
+    :type p: str
+    :return: A tuple containing the given path and whether formatting succeeded
+    :rtype: tuple[str, bool]
+    """
+    try:
+        format_jsonc_file(Path(p))
+    except Exception:
+        return p, False
+    return p, True
 
 
 def main(argv):
-    failed_files = []
-    for p in argv:
-        path = Path(p)
-        try:
-            format_jsonc_file(path)
-        except Exception:
-            failed_files.append(p)
+    if len(argv) >= POOL_MIN_FILES:
+        with ProcessPoolExecutor() as ex:
+            results = list(ex.map(try_format_jsonc_file, argv))
+    else:
+        results = [try_format_jsonc_file(p) for p in argv]
+    failed_files = [p for p, ok in results if not ok]
 
     if failed_files:
         print("Auto-format JSON(C) files failed for:")
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
+import io
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from ruamel.yaml import YAML
@@ -12,41 +15,33 @@ yaml.Representer.add_representer(
     lambda self, data: self.represent_scalar("tag:yaml.org,2002:null", "null"),
 )  # conserve 'null'
 
+TRAILING_WS_RE = re.compile(r"[^\S\n]+$", re.M)
+COMMENT_INDENT_RE = re.compile(r"^[^\S\n]+(?=#)", re.M)
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+CONTENT_RE = re.compile(r"^[^\S\n]*[^\s#]", re.M)
+POOL_MIN_FILES = 5  # See format_jsonc.POOL_MIN_FILES
 
-def compress_comments(file_path: Path) -> None:
-    """
-    Compress comment-only files or comment lines between YAML nodes.
 
-    :param file_path: The path to the YAML file to compress
-    :type file_path: Path
+def clean_yaml_text(text: str, compress: bool) -> str:
     """
-    lines = file_path.read_text(encoding="utf-8").splitlines()
-
-    compressed = []
-    for ln in lines:
-        stripped = ln.strip()
-        if stripped.startswith("#"):  # Comment line
-            compressed.append(stripped)
-        elif stripped:  # YAML content (+ any inline comment)
-            compressed.append(ln)
-        else:  # Blank line - add max one
-            if compressed and compressed[-1].strip() != "":
-                compressed.append(ln)
+    Strip trailing whitespace from each line and optionally compress comments.
 
-    file_path.write_text("\n".join(compressed) + "\n")
+    When compressing, comment lines are dedented and runs of blank lines
+    between YAML nodes are collapsed into one (leading blanks are dropped).
 
-
-def strip_trailing_whitespace(file_path: Path) -> None:
+    :param text: The YAML text to clean
+    :type text: str
+    :param compress: Whether to also compress comments and blank lines
+    :type compress: bool
+    :return: The cleaned text, ending with a single newline
+    :rtype: str
     """
-    Strip trailing whitespace from each line in the given file.
+    text = TRAILING_WS_RE.sub("", text)
+    if compress:
+        text = COMMENT_INDENT_RE.sub("", text).lstrip("\n")
+        text = BLANK_LINES_RE.sub("\n\n", text)  # Blank lines - max one
 
-    :param file_path: The path to the YAML file to process
-    :type file_path: Path
-    """
-    # Ensure whitespace consistency
-    lines = file_path.read_text(encoding="utf-8").splitlines()
-    stripped = [ln.rstrip() for ln in lines]
-    file_path.write_text("\n".join(stripped) + "\n", encoding="utf-8")
+    return text.rstrip("\n") + "\n"
 
 
 def format_file(file_path: Path) -> None:
@@ -56,29 +51,32 @@ def format_file(file_path: Path) -> None:
     :param file_path: The path to the YAML file to format
     :type file_path: Path
     """
-    text = file_path.read_text(encoding="utf-8")
+    text = file_path.read_bytes().decode("utf-8")
     if text == "":
         # Leave empty files completely untouched
         return
 
+    formatted = text
     if not file_path.parent == Path(".github/workflows"):
-        compress_comments(file_path)
-
-    with file_path.open("r", encoding="utf-8") as f:
-        data = yaml.load(f)
-
-    if data is not None:
-        # Only comments exist; leave as-is
-        return
+        formatted = clean_yaml_text(formatted, compress=True)
 
-    with file_path.open("w", encoding="utf-8") as f:
-        yaml.dump(data, f)
+    # Skip parsing entirely for files without any non-comment line
+    data = yaml.load(formatted) if CONTENT_RE.search(formatted) else None
+    if data is not None:  # Otherwise only comments exist; leave as-is
+        buf = io.StringIO()
+        yaml.dump(data, buf)
+        # Final cleanup so trailing-whitespace hook has nothing left to fix
+        formatted = clean_yaml_text(buf.getvalue(), compress=False)
 
-    # Final cleanup so trailing-whitespace hook has nothing left to fix
-    strip_trailing_whitespace(file_path)
+    if formatted != text:
+        file_path.write_bytes(formatted.encode("utf-8"))
 
 
 if __name__ == "__main__":
-    paths = sys.argv[1:]
-    for p in paths:
-        format_file(Path(p))
+    paths = [Path(p) for p in sys.argv[1:]]
+    if len(paths) >= POOL_MIN_FILES:
+        with ProcessPoolExecutor() as ex:
+            list(ex.map(format_file, paths))
+    else:
+        for p in paths:
+            format_file(p)